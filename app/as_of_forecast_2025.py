@@ -1,8 +1,14 @@
+import sys
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+# Make the repo root importable so the app can reuse `src` helpers
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.downsample import MAX_PLOT_POINTS, lttb_frame
+
 # -----------------------------
 # Page config MUST be first
 # -----------------------------
@@ -151,6 +157,73 @@ fig.tight_layout()
 
 st.pyplot(fig)
 
+# -----------------------------
+# Full-period overview (downsampled, zoomable)
+# -----------------------------
+st.subheader("Full Period Overview")
+
+st.sidebar.header("Overview chart")
+
+max_points = st.sidebar.number_input(
+    "Max plotted points",
+    min_value=100,
+    max_value=20000,
+    value=MAX_PLOT_POINTS,
+    step=100
+)
+
+zoom_start, zoom_end = st.slider(
+    "Zoom window",
+    min_value=available_dates[0],
+    max_value=available_dates[-1],
+    value=(available_dates[0], available_dates[-1]),
+    format="YYYY-MM-DD"
+)
+
+full_resolution = st.checkbox(
+    "Show every point in the zoom window (no downsampling)",
+    value=False
+)
+
+window = df[
+    (df["forecast_date"].dt.date >= zoom_start)
+    & (df["forecast_date"].dt.date <= zoom_end)
+]
+
+overview = window if full_resolution else lttb_frame(
+    window, "forecast_date", ["actual", "forecast"], int(max_points)
+)
+
+fig, ax = plt.subplots(figsize=(12, 4))
+
+ax.plot(
+    overview["forecast_date"],
+    overview["actual"],
+    label="Actual",
+    linewidth=1
+)
+
+ax.plot(
+    overview["forecast_date"],
+    overview["forecast"],
+    label="Naive forecast",
+    linewidth=1
+)
+
+ax.set_title("Actual vs Naive Forecast (selected window)")
+ax.set_xlabel("Date")
+ax.set_ylabel("Max Temperature (°C)")
+ax.grid(True)
+ax.legend()
+fig.tight_layout()
+
+st.pyplot(fig)
+
+st.caption(
+    f"Plotted {len(overview):,} of {len(window):,} points "
+    "(Largest-Triangle-Three-Buckets downsampling keeps peaks and troughs)"
+)
+
 # -----------------------------
 # Raw row (optional transparency)
 # -----------------------------
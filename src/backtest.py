@@ -1,4 +1,8 @@
+import math
+from typing import Dict, Optional
+
 import numpy as np
+import pandas as pd
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
 def backtest_forecast(y_true, y_pred):
@@ -19,3 +23,233 @@ def backtest_forecast(y_true, y_pred):
         "MAE": float(mae),
         "RMSE": rmse
     }
+
+
+# -----------------------------
+# Uncertainty: block bootstrap + paired tests
+# -----------------------------
+# Cap on index-matrix cells materialised at once (~32 MB of int64).
+# Resamples are drawn in batches under this cap so memory stays flat
+# while runtime scales linearly with series length.
+_MAX_BATCH_CELLS = 1 << 22
+
+
+def _aligned(y_true, *preds):
+    """
+    Drop rows where the target or any prediction is missing.
+    Returns float64 NumPy arrays.
+    """
+    arrays = [np.asarray(a, dtype=float) for a in (y_true, *preds)]
+    mask = np.ones(len(arrays[0]), dtype=bool)
+    for a in arrays:
+        mask &= ~np.isnan(a)
+    return [a[mask] for a in arrays]
+
+
+def _check_bootstrap_args(
+    n: int,
+    n_resamples: int,
+    block_length: Optional[int],
+    confidence: float,
+) -> int:
+    """
+    Validate bootstrap settings and return the block length to use.
+    Blocks must be shorter than the series: with block_length >= n every
+    circular resample is a rotation of the data and the CI collapses.
+    """
+    if n < 2:
+        raise ValueError(f"Need at least 2 aligned observations to bootstrap, got {n}")
+    if n_resamples < 1:
+        raise ValueError(f"n_resamples must be >= 1, got {n_resamples}")
+    if not 0.0 < confidence < 1.0:
+        raise ValueError(f"confidence must be in (0, 1), got {confidence}")
+    if block_length is None:
+        return min(default_block_length(n), n - 1)
+    if not 1 <= block_length < n:
+        raise ValueError(f"block_length must be in [1, {n - 1}] for n={n}, got {block_length}")
+    return block_length
+
+
+def default_block_length(n: int) -> int:
+    """
+    Rule-of-thumb block length n^(1/3) for the moving-block bootstrap.
+    """
+    return max(1, int(round(n ** (1.0 / 3.0))))
+
+
+def block_bootstrap_indices(
+    n: int,
+    n_resamples: int,
+    block_length: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Circular moving-block bootstrap indices, shape (n_resamples, n).
+    Each row concatenates random contiguous blocks so short-range
+    autocorrelation in the residuals is preserved.
+    """
+    if block_length < 1:
+        raise ValueError(f"block_length must be >= 1, got {block_length}")
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n, size=(n_resamples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_length)) % n
+    return idx.reshape(n_resamples, -1)[:, :n]
+
+
+def _bootstrap_means(
+    values: np.ndarray,
+    n_resamples: int,
+    block_length: int,
+    seed: Optional[int],
+) -> np.ndarray:
+    """
+    Bootstrap distribution of column means of `values` (shape (n, k)).
+    Returns an array of shape (n_resamples, k).
+    """
+    n = values.shape[0]
+    rng = np.random.default_rng(seed)
+    batch = max(1, _MAX_BATCH_CELLS // n)
+
+    out = np.empty((n_resamples, values.shape[1]))
+    for lo in range(0, n_resamples, batch):
+        hi = min(lo + batch, n_resamples)
+        idx = block_bootstrap_indices(n, hi - lo, block_length, rng)
+        out[lo:hi] = values[idx].mean(axis=1)
+    return out
+
+
+def bootstrap_metrics(
+    y_true,
+    y_pred,
+    n_resamples: int = 2000,
+    block_length: Optional[int] = None,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0,
+) -> Dict[str, float]:
+    """
+    Point MAE/RMSE plus block-bootstrap percentile confidence intervals.
+    """
+    y_true, y_pred = _aligned(y_true, y_pred)
+    n = len(y_true)
+    block_length = _check_bootstrap_args(n, n_resamples, block_length, confidence)
+
+    err = y_true - y_pred
+    losses = np.column_stack([np.abs(err), err ** 2])
+    boot = _bootstrap_means(losses, n_resamples, block_length, seed)
+
+    alpha = (1.0 - confidence) / 2.0
+    q = [alpha, 1.0 - alpha]
+    mae_lo, mae_hi = np.quantile(boot[:, 0], q)
+    rmse_lo, rmse_hi = np.sqrt(np.quantile(boot[:, 1], q))
+
+    return {
+        "MAE": float(losses[:, 0].mean()),
+        "MAE_low": float(mae_lo),
+        "MAE_high": float(mae_hi),
+        "RMSE": float(np.sqrt(losses[:, 1].mean())),
+        "RMSE_low": float(rmse_lo),
+        "RMSE_high": float(rmse_hi),
+        "block_length": int(block_length),
+        "n": int(n),
+    }
+
+
+def _loss(err: np.ndarray, loss: str) -> np.ndarray:
+    if loss == "absolute":
+        return np.abs(err)
+    if loss == "squared":
+        return err ** 2
+    raise ValueError(f"Unknown loss: {loss!r} (use 'absolute' or 'squared')")
+
+
+def diebold_mariano(
+    y_true,
+    pred_model,
+    pred_baseline,
+    horizon: int = 1,
+    loss: str = "absolute",
+) -> Dict[str, float]:
+    """
+    Diebold-Mariano test of equal accuracy (with the Harvey et al.
+    small-sample correction). Negative statistic = model beats baseline.
+    p-value is two-sided under a normal reference distribution.
+    """
+    y_true, pm, pb = _aligned(y_true, pred_model, pred_baseline)
+    n = len(y_true)
+    if n < 2:
+        raise ValueError("Need at least 2 aligned observations")
+
+    d = _loss(y_true - pm, loss) - _loss(y_true - pb, loss)
+    d_mean = d.mean()
+    dc = d - d_mean
+
+    # Long-run variance from autocovariances up to lag h-1
+    lrv = dc @ dc / n
+    for k in range(1, min(horizon, n)):
+        lrv += 2.0 * (dc[k:] @ dc[:-k]) / n
+
+    if lrv <= 0:
+        return {"DM": 0.0, "p_value": 1.0, "mean_loss_diff": float(d_mean), "n": int(n)}
+
+    stat = d_mean / math.sqrt(lrv / n)
+    stat *= math.sqrt((n + 1 - 2 * horizon + horizon * (horizon - 1) / n) / n)
+    p_value = math.erfc(abs(stat) / math.sqrt(2.0))
+
+    return {
+        "DM": float(stat),
+        "p_value": float(p_value),
+        "mean_loss_diff": float(d_mean),
+        "n": int(n),
+    }
+
+
+def bootstrap_loss_difference(
+    y_true,
+    pred_model,
+    pred_baseline,
+    loss: str = "absolute",
+    n_resamples: int = 2000,
+    block_length: Optional[int] = None,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0,
+) -> Dict[str, float]:
+    """
+    Paired block-bootstrap CI for mean loss(model) - loss(baseline).
+    Both forecasts are resampled on the same indices, so the interval
+    reflects the paired difference rather than two independent CIs.
+    """
+    y_true, pm, pb = _aligned(y_true, pred_model, pred_baseline)
+    n = len(y_true)
+    block_length = _check_bootstrap_args(n, n_resamples, block_length, confidence)
+
+    d = _loss(y_true - pm, loss) - _loss(y_true - pb, loss)
+    boot = _bootstrap_means(d[:, None], n_resamples, block_length, seed)[:, 0]
+
+    alpha = (1.0 - confidence) / 2.0
+    lo, hi = np.quantile(boot, [alpha, 1.0 - alpha])
+
+    return {
+        "mean_loss_diff": float(d.mean()),
+        "low": float(lo),
+        "high": float(hi),
+        "share_model_better": float((boot < 0).mean()),
+        "block_length": int(block_length),
+        "n": int(n),
+    }
+
+
+def backtest_by_group(y_true, y_pred, groups):
+    """
+    backtest_forecast per group (e.g. change-point regime).
+    Rows missing either the actual or the prediction are dropped first.
+    Returns a DataFrame indexed by group with n, MAE, RMSE and bias
+    (mean of actual - predicted).
+    """
+    frame = pd.DataFrame({"y_true": y_true, "y_pred": y_pred, "group": groups})
+    frame = frame.dropna(subset=["y_true", "y_pred"])
+    rows = {}
+    for key, g in frame.groupby("group", sort=True):
+        m = backtest_forecast(g["y_true"], g["y_pred"])
+        bias = float((g["y_true"] - g["y_pred"]).mean())
+        rows[key] = {"n": len(g), **m, "bias": bias}
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis("group")
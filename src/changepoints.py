@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+from typing import Optional, Sequence
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Config
+# -----------------------------
+DATA_PATH = Path("data/processed/hargeisa_daily_weather.parquet")
+
+REGIME_COLUMNS = ["temp_max", "temp_min", "precipitation"]
+REGIME_COL = "regime"
+
+# Above this many rows, pelt warns that a change-point-poor series can
+# make it quadratic (detect_regimes stays well below it on daily data)
+PELT_WARN_ROWS = 20_000
+
+# How sub-daily (e.g. hourly) rows are rolled up to days before
+# segmentation; unlisted columns use the daily mean
+DAILY_AGG = {"temp_max": "max", "temp_min": "min", "precipitation": "sum"}
+
+
+def _robust_scale(x: np.ndarray) -> np.ndarray:
+    """
+    Per-column noise scale from first differences (MAD / sqrt(2)).
+    Uses differences so slow seasonal drift does not inflate the scale.
+    Falls back to the std, then 1.0, for near-constant columns
+    (e.g. precipitation in a dry season).
+    """
+    d = np.diff(x, axis=0)
+    mad = np.median(np.abs(d - np.median(d, axis=0)), axis=0)
+    scale = 1.4826 * mad / np.sqrt(2.0)
+    std = x.std(axis=0)
+    scale = np.where(scale > 0, scale, std)
+    return np.where(scale > 0, scale, 1.0)
+
+
+def pelt(signal: np.ndarray, penalty: float, min_size: int = 2) -> np.ndarray:
+    """
+    PELT change-point search with a Gaussian mean-shift (L2) cost.
+
+    Segment costs come from cumulative sums, so each step is O(|R|) and
+    evaluated over all surviving candidates at once. Pruning drops a
+    candidate once a later change point beats it, so the run is linear
+    only when the number of change points grows with n. On a series with
+    few changes (e.g. long raw noise) |R| keeps growing and the cost is
+    quadratic; a warning is issued above PELT_WARN_ROWS rows. Aggregate
+    such input first, as detect_regimes does for sub-daily data.
+
+    Returns sorted segment end indices (exclusive); the last one is n.
+    """
+    x = np.asarray(signal, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    n = x.shape[0]
+    if n < 2 * min_size:
+        return np.array([n])
+    if n > PELT_WARN_ROWS:
+        warnings.warn(
+            f"pelt on {n} rows can be quadratic when change points are rare; "
+            "consider aggregating the series first",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+
+    cs1 = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(x, axis=0)])
+    cs2 = np.concatenate([[0.0], np.cumsum((x ** 2).sum(axis=1))])
+
+    F = np.full(n + 1, np.inf)
+    F[0] = -penalty
+    last = np.zeros(n + 1, dtype=np.int64)
+
+    # Surviving candidates live in buf[:m]; pruning compacts in place
+    buf = np.empty(n + 1, dtype=np.int64)
+    m = 0
+
+    for t in range(min_size, n + 1):
+        s_new = t - min_size
+        if s_new == 0 or s_new >= min_size:
+            buf[m] = s_new
+            m += 1
+
+        cands = buf[:m]
+        seg_len = t - cands
+        s1 = cs1[t] - cs1[cands]
+        cost = (cs2[t] - cs2[cands]) - (s1 ** 2).sum(axis=1) / seg_len
+        total = F[cands] + cost
+
+        best = int(np.argmin(total))
+        F[t] = total[best] + penalty
+        last[t] = cands[best]
+
+        keep = cands[total <= F[t]]
+        m = len(keep)
+        buf[:m] = keep
+
+    bkps = []
+    t = n
+    while t > 0:
+        bkps.append(t)
+        t = int(last[t])
+    return np.array(bkps[::-1])
+
+
+def segment_labels(bkps: Sequence[int], n: int) -> np.ndarray:
+    """
+    Turn segment end indices into an integer label per row (0, 1, 2, ...).
+    """
+    labels = np.zeros(n, dtype=np.int32)
+    starts = np.asarray(bkps[:-1], dtype=np.int64)
+    labels[starts[starts < n]] = 1
+    return np.cumsum(labels).astype(np.int32)
+
+
+def _is_subdaily(dates: pd.Series) -> bool:
+    if len(dates) < 2:
+        return False
+    step = np.median(np.diff(dates.to_numpy(dtype="datetime64[ns]")))
+    return step < np.timedelta64(1, "D")
+
+
+def detect_regimes(
+    df: pd.DataFrame,
+    columns: Sequence[str] = REGIME_COLUMNS,
+    penalty: Optional[float] = None,
+    min_size: int = 7,
+    group_col: Optional[str] = None,
+    time_col: str = "date",
+) -> pd.Series:
+    """
+    Label each row with a regime id from joint change-points in `columns`.
+
+    Columns are scaled by their day-to-day noise so one penalty works
+    for all of them. Default penalty is BIC-like: 2 * k * log(n).
+    With `group_col` (e.g. city) each group is segmented independently
+    and labels restart at 0 per group.
+
+    Segmentation always runs on daily values: sub-daily input is first
+    aggregated per day (see DAILY_AGG), otherwise the mean-shift cost
+    would split every diurnal cycle. Each row then gets its day's label,
+    and `min_size` is in days. Rows must already be in time order.
+    """
+    if group_col is None:
+        groups = [(None, df.index)]
+    else:
+        groups = df.groupby(group_col, sort=False).groups.items()
+
+    out = pd.Series(0, index=df.index, dtype=np.int32, name=REGIME_COL)
+    for _, idx in groups:
+        block = df.loc[idx, list(columns)].astype(float)
+        day_pos = None
+        if time_col in df.columns and _is_subdaily(df.loc[idx, time_col]):
+            day = pd.to_datetime(df.loc[idx, time_col]).dt.floor("D")
+            block = block.groupby(day.to_numpy()).agg({c: DAILY_AGG.get(c, "mean") for c in columns})
+            day_pos = block.index.get_indexer(day)
+
+        x = block.ffill().bfill().to_numpy()
+        n, k = x.shape
+        if n == 0:
+            continue
+
+        x = (x - x.mean(axis=0)) / _robust_scale(x)
+        pen = 2.0 * k * np.log(max(n, 2)) if penalty is None else penalty
+
+        bkps = pelt(x, penalty=pen, min_size=min_size)
+        labels = segment_labels(bkps, n)
+        out.loc[idx] = labels if day_pos is None else labels[day_pos]
+
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect weather regimes and store labels in the processed parquet.")
+    parser.add_argument("--data", type=str, default=str(DATA_PATH))
+    parser.add_argument("--penalty", type=float, default=None, help="Default: 2 * n_columns * log(n)")
+    parser.add_argument("--min_size", type=int, default=7, help="Minimum regime length (days)")
+    parser.add_argument("--group_col", type=str, default=None, help="Segment each group (e.g. city) separately")
+    args = parser.parse_args()
+
+    path = Path(args.data)
+    sort_cols = ["date"] if args.group_col is None else [args.group_col, "date"]
+    df = pd.read_parquet(path).sort_values(sort_cols).reset_index(drop=True)
+
+    df[REGIME_COL] = detect_regimes(
+        df, penalty=args.penalty, min_size=args.min_size, group_col=args.group_col
+    )
+
+    keys = [REGIME_COL] if args.group_col is None else [args.group_col, REGIME_COL]
+    summary = df.groupby(keys).agg(
+        start=("date", "min"),
+        end=("date", "max"),
+        rows=("date", "size"),
+        temp_max=("temp_max", "mean"),
+        temp_min=("temp_min", "mean"),
+        precipitation=("precipitation", "sum"),
+    )
+
+    print(f"[regimes] {len(summary)} segments over {len(df)} rows")
+    print(summary.round({"temp_max": 2, "temp_min": 2, "precipitation": 2}).to_string())
+
+    df.to_parquet(path, index=False)
+    print(f"\n[saved] '{REGIME_COL}' column → {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
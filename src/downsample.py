@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# Default number of points handed to a line plot
+MAX_PLOT_POINTS = 2000
+
+
+def _as_float(x) -> np.ndarray:
+    """
+    Numeric view of an x-axis (datetimes become int64 nanoseconds).
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    return x.astype(float)
+
+
+def lttb_indices(x, y, n_out: int = MAX_PLOT_POINTS) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the sorted positions of at most `n_out` points that preserve
+    the visual shape of y(x). First and last points are always kept.
+    Bucket averages come from one np.add.reduceat pass, and each bucket's
+    triangle areas are computed as one array op, so the Python loop runs
+    n_out times regardless of input length. NaNs in y are skipped.
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.arange(len(y), dtype=float) if x is None else _as_float(x)
+
+    valid = np.flatnonzero(~np.isnan(y))
+    x, y = x[valid], y[valid]
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return valid
+
+    n_buckets = n_out - 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    counts = np.diff(edges)
+
+    # Average of each bucket, plus the final point as the last "next bucket"
+    avg_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+
+    a = 0
+    for i in range(n_buckets):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+
+    return valid[out]
+
+
+def lttb_frame(
+    df: pd.DataFrame,
+    x_col: str,
+    y_cols: Sequence[str],
+    n_out: Optional[int] = MAX_PLOT_POINTS,
+) -> pd.DataFrame:
+    """
+    Downsample `df` for line plots of `y_cols` against `x_col`.
+
+    Each series is reduced with LTTB and the union of kept rows is
+    returned, so every plotted line keeps its own peaks and troughs.
+    Frames already within `n_out` rows (or n_out=None) are returned as-is.
+    """
+    if n_out is None or len(df) <= n_out:
+        return df
+
+    per_series = max(3, n_out // len(y_cols))
+    keep = np.unique(np.concatenate([
+        lttb_indices(df[x_col].to_numpy(), df[c].to_numpy(), per_series)
+        for c in y_cols
+    ]))
+    return df.iloc[keep]
@@ -4,6 +4,9 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
+from src.backtest import bootstrap_loss_difference, bootstrap_metrics, diebold_mariano
+from src.downsample import MAX_PLOT_POINTS, lttb_frame
+
 DATA_PATH = Path("data/processed/hargeisa_daily_weather.parquet")
 SPLIT_DATE = "2024-01-01"  # test period start (edit if you want)
 
@@ -26,6 +29,7 @@ def main():
     # ----------------------------
     df["y_true"] = df["temp_max"].shift(-1)
     df["y_pred"] = df["temp_max"]  # persistence baseline
+    df["y_seasonal"] = df["temp_max"].shift(6)  # same weekday last week
 
     df = df.dropna(subset=["y_true", "y_pred"]).reset_index(drop=True)
 
@@ -42,8 +46,16 @@ def main():
 
     print("V1 Persistence Baseline (1-day ahead temp_max)")
     print(f"Test start date: {SPLIT_DATE}")
-    print(f"MAE  : {mae:.3f} °C")
-    print(f"RMSE : {r:.3f} °C")
+    ci = bootstrap_metrics(y_true, y_pred)
+    print(f"MAE  : {mae:.3f} °C  (95% CI {ci['MAE_low']:.3f} – {ci['MAE_high']:.3f})")
+    print(f"RMSE : {r:.3f} °C  (95% CI {ci['RMSE_low']:.3f} – {ci['RMSE_high']:.3f})")
+
+    # Paired comparison: 7-day seasonal naive vs persistence
+    dm = diebold_mariano(y_true, test["y_seasonal"], y_pred)
+    diff = bootstrap_loss_difference(y_true, test["y_seasonal"], y_pred)
+    print("\nSeasonal naive (7-day) vs persistence, abs-error loss")
+    print(f"Mean loss diff : {diff['mean_loss_diff']:+.3f} °C  (95% CI {diff['low']:+.3f} – {diff['high']:+.3f})")
+    print(f"Diebold-Mariano: {dm['DM']:+.2f}  (p = {dm['p_value']:.3g})")
 
     # Residuals
     test["residual"] = y_true - y_pred
@@ -52,7 +64,7 @@ def main():
     # ----------------------------
     # Plot 1: Actual vs Predicted (last 120 days of test for clarity)
     # ----------------------------
-    view = test.tail(120)
+    view = lttb_frame(test.tail(120), "date", ["y_true", "y_pred"], MAX_PLOT_POINTS)
 
     plt.figure(figsize=(14, 5))
     plt.plot(view["date"], view["y_true"], linewidth=1, label="Actual (tomorrow)")
@@ -69,7 +81,7 @@ def main():
     # ----------------------------
     # Plot 2: Residuals over time (last 180 days)
     # ----------------------------
-    view = test.tail(180)
+    view = lttb_frame(test.tail(180), "date", ["residual"], MAX_PLOT_POINTS)
 
     plt.figure(figsize=(14, 4))
     plt.plot(view["date"], view["residual"], linewidth=1)
@@ -99,9 +111,10 @@ def main():
     # Plot 4: Rolling MAE (30-day window)
     # ----------------------------
     test["rolling_mae_30"] = test["abs_error"].rolling(30).mean()
+    view = lttb_frame(test, "date", ["rolling_mae_30"], MAX_PLOT_POINTS)
 
     plt.figure(figsize=(14, 4))
-    plt.plot(test["date"], test["rolling_mae_30"], linewidth=1)
+    plt.plot(view["date"], view["rolling_mae_30"], linewidth=1)
     plt.title("Rolling MAE (30-day) — Persistence Baseline")
     plt.xlabel("Date")
     plt.ylabel("MAE (°C)")
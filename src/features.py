@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+import re
+import sys
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Config
+# -----------------------------
+DATA_PATH = Path("data/processed/hargeisa_daily_weather.parquet")
+FEATURE_DIR = Path("data/features")
+
+BASE_COLUMNS = ["temp_max", "temp_min", "precipitation", "wind_speed_max"]
+LAGS = (0, 1, 2, 3, 7, 14)
+WINDOWS = (3, 7, 14, 30)
+
+# Bump when feature definitions change so old caches are not reused
+FEATURE_VERSION = 1
+
+
+def _rolling_sums(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Trailing-window sum, sum of squares and valid count for every column
+    of `x` (shape (n, k)), via cumulative sums. NaNs count as missing.
+    """
+    valid = ~np.isnan(x)
+    x0 = np.where(valid, x, 0.0)
+
+    def trailing(a: np.ndarray) -> np.ndarray:
+        cs = np.vstack([np.zeros((1, a.shape[1])), np.cumsum(a, axis=0)])
+        out = cs[1:].copy()
+        out[window:] -= cs[1:-window]
+        return out
+
+    return trailing(x0), trailing(x0 ** 2), trailing(valid.astype(float))
+
+
+def build_feature_matrix(
+    df: pd.DataFrame,
+    columns: Sequence[str] = BASE_COLUMNS,
+    lags: Sequence[int] = LAGS,
+    windows: Sequence[int] = WINDOWS,
+) -> pd.DataFrame:
+    """
+    As-of feature matrix: row t only uses observations up to and including t.
+
+    - `{col}_lag{k}`: value at t-k (lag0 is today's observation)
+    - `{col}_mean{w}` / `{col}_std{w}`: trailing window ending at t
+    - `doy_sin` / `doy_cos`: day-of-year harmonics of t
+    - `diurnal_range`: temp_max - temp_min at t, plus its trailing means
+
+    Windows with any missing value give NaN. Rows must be in date order
+    with one row per time step. All features are float32.
+    """
+    x = df[list(columns)].to_numpy(dtype=float)
+    n = len(x)
+    feats: Dict[str, np.ndarray] = {}
+
+    for k in lags:
+        lagged = np.full_like(x, np.nan)
+        lagged[k:] = x[:n - k]
+        for j, col in enumerate(columns):
+            feats[f"{col}_lag{k}"] = lagged[:, j]
+
+    for w in windows:
+        s, s2, cnt = _rolling_sums(x, w)
+        full = cnt == w
+        mean = np.where(full, s / w, np.nan)
+        var = np.where(full, s2 / w - mean ** 2, np.nan)
+        std = np.sqrt(np.clip(var * w / max(w - 1, 1), 0.0, None))
+        for j, col in enumerate(columns):
+            feats[f"{col}_mean{w}"] = mean[:, j]
+            feats[f"{col}_std{w}"] = std[:, j]
+
+    dates = pd.to_datetime(df["date"])
+    angle = 2.0 * np.pi * (dates.dt.dayofyear.to_numpy() - 1) / 365.25
+    feats["doy_sin"] = np.sin(angle)
+    feats["doy_cos"] = np.cos(angle)
+
+    if "temp_max" in df.columns and "temp_min" in df.columns:
+        dtr = (df["temp_max"] - df["temp_min"]).to_numpy(dtype=float)[:, None]
+        feats["diurnal_range"] = dtr[:, 0]
+        for w in windows:
+            s, _, cnt = _rolling_sums(dtr, w)
+            feats[f"diurnal_range_mean{w}"] = np.where(cnt == w, s / w, np.nan)[:, 0]
+
+    out = pd.DataFrame({name: v.astype(np.float32) for name, v in feats.items()}, index=df.index)
+    out.insert(0, "date", dates.to_numpy())
+    return out
+
+
+def data_version(
+    df: pd.DataFrame,
+    columns: Sequence[str] = BASE_COLUMNS,
+    lags: Sequence[int] = LAGS,
+    windows: Sequence[int] = WINDOWS,
+) -> str:
+    """
+    Short hash of the input rows plus the feature configuration.
+    Any change to the data or to the feature definitions gives a new key.
+    """
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(df[["date", *columns]], index=False).to_numpy().tobytes())
+    config = {"columns": list(columns), "lags": list(lags), "windows": list(windows), "version": FEATURE_VERSION}
+    h.update(json.dumps(config, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+def _prune_stale(cache_dir: Path, name: str, keep: Path):
+    """
+    Delete cached matrices for `name` whose key is not the current one.
+    """
+    pattern = re.compile(re.escape(name) + r"_[0-9a-f]{16}")
+    for old in Path(cache_dir).glob(f"{name}_*.parquet"):
+        if old != keep and pattern.fullmatch(old.stem):
+            old.unlink()
+
+
+def load_or_build_features(
+    df: pd.DataFrame,
+    name: str = "hargeisa_daily",
+    cache_dir: Path = FEATURE_DIR,
+    columns: Sequence[str] = BASE_COLUMNS,
+    lags: Sequence[int] = LAGS,
+    windows: Sequence[int] = WINDOWS,
+) -> Tuple[pd.DataFrame, Path]:
+    """
+    Return (features, cache_path) for `df`, reading the float32 parquet
+    cache when the data version matches and building it otherwise.
+    A fresh build removes older cached versions for the same `name`.
+    """
+    key = data_version(df, columns, lags, windows)
+    path = Path(cache_dir) / f"{name}_{key}.parquet"
+
+    if path.exists():
+        out = pd.read_parquet(path)
+        out.index = df.index
+        return out, path
+
+    out = build_feature_matrix(df, columns, lags, windows)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out.to_parquet(path, index=False)
+    _prune_stale(path.parent, name, keep=path)
+    return out, path
+
+
+def walk_forward_views(
+    features: pd.DataFrame,
+    target: np.ndarray,
+    start: int,
+    horizon: int = 1,
+    stop: Optional[int] = None,
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Yield (t, X_train, y_train, x_today) for each forecast origin t.
+
+    `target[i]` is the value `horizon` steps after row i. Training rows
+    are those whose target was already observed at t (i + horizon <= t),
+    so nothing from the future leaks in. Arrays are positional slices of
+    one float32 matrix, not recomputed per step.
+    """
+    X = features.drop(columns=["date"]).to_numpy(dtype=np.float32)
+    y = np.asarray(target, dtype=np.float32)
+    stop = len(X) if stop is None else stop
+
+    for t in range(start, stop):
+        n_train = max(0, t - horizon + 1)
+        yield t, X[:n_train], y[:n_train], X[t]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build (or reuse) the cached feature matrix.")
+    parser.add_argument("--data", type=str, default=str(DATA_PATH))
+    parser.add_argument("--cache_dir", type=str, default=str(FEATURE_DIR))
+    args = parser.parse_args()
+
+    df = pd.read_parquet(args.data).sort_values("date").reset_index(drop=True)
+    features, path = load_or_build_features(df, name=Path(args.data).stem, cache_dir=Path(args.cache_dir))
+
+    print(f"[features] {features.shape[0]} rows × {features.shape[1] - 1} features")
+    print(f"[cache]    {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 from dataclasses import dataclass
+import os
 from pathlib import Path
 import sys
 import time
@@ -12,11 +13,16 @@ import numpy as np
 import pandas as pd
 import requests
 
+from src.validate import validate_frame
+
 
 # -----------------------------
 # Config
 # -----------------------------
-OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+# Override with the env var to point at a local replay server (see src/replay.py)
+OPEN_METEO_ARCHIVE_URL = os.environ.get(
+    "OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive"
+)
 
 @dataclass
 class City:
@@ -42,6 +48,17 @@ DAILY_VARS = [
 ]
 
 
+def _retry_after_s(response: requests.Response, default: float) -> float:
+    """
+    Seconds to wait after a 429, from the Retry-After header when it is
+    a plain number of seconds, otherwise the regular backoff.
+    """
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return default
+
+
 def fetch_archive_daily(
     lat: float,
     lon: float,
@@ -50,10 +67,14 @@ def fetch_archive_daily(
     timezone: str,
     retries: int = 3,
     sleep_s: float = 1.0,
+    url: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
 ) -> pd.DataFrame:
     """
     Fetch daily archive data from Open-Meteo.
     Returns a DataFrame with 'date' + weather columns.
+    Failed attempts back off linearly (sleep_s * attempt); rate-limited
+    (429) responses wait for the server's Retry-After instead.
     """
     params = {
         "latitude": lat,
@@ -67,7 +88,10 @@ def fetch_archive_daily(
     last_err: Optional[Exception] = None
     for attempt in range(1, retries + 1):
         try:
-            r = requests.get(OPEN_METEO_ARCHIVE_URL, params=params, timeout=30)
+            r = requests.get(url or OPEN_METEO_ARCHIVE_URL, params=params, headers=headers, timeout=30)
+            if r.status_code == 429 and attempt < retries:
+                time.sleep(_retry_after_s(r, sleep_s * attempt))
+                continue
             r.raise_for_status()
             data = r.json()
 
@@ -158,13 +182,13 @@ def main():
     for col in ["temp_max", "temp_min", "precipitation", "wind_speed_max"]:
         df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    # Some quick sanity info
-    n_missing = df.isna().sum()
+    # Quality checks (missing, ranges, stuck sensors, spikes, ...)
+    _, report = validate_frame(df)
     print("\n[summary]")
     print(f"date range: {df['date'].min().date()} → {df['date'].max().date()}")
     print(f"rows      : {len(df)}")
-    print("missing values per column:")
-    print(n_missing.to_string())
+    print("rows flagged per quality check:")
+    print(report.to_string())
 
     # Save
     df.to_csv(out_raw, index=False)
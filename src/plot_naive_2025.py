@@ -3,6 +3,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+from src.backtest import backtest_by_group
+from src.downsample import MAX_PLOT_POINTS, lttb_frame
+
 CSV_PATH = Path("reports/naive_walk_forward_2025.csv")
 FIG_DIR = Path("reports/figures_2025")
 FIG_DIR.mkdir(parents=True, exist_ok=True)
@@ -16,9 +19,11 @@ def main():
     # -----------------------------
     # 1) Actual vs Forecast
     # -----------------------------
+    view = lttb_frame(df, "forecast_date", ["actual", "forecast"], MAX_PLOT_POINTS)
+
     plt.figure(figsize=(14, 5))
-    plt.plot(df["forecast_date"], df["actual"], label="Actual", linewidth=1)
-    plt.plot(df["forecast_date"], df["forecast"], label="Naive Forecast", linewidth=1)
+    plt.plot(view["forecast_date"], view["actual"], label="Actual", linewidth=1)
+    plt.plot(view["forecast_date"], view["forecast"], label="Naive Forecast", linewidth=1)
     plt.title("Naive Walk-Forward Forecast vs Actual (2025)")
     plt.xlabel("Date")
     plt.ylabel("Max Temperature (°C)")
@@ -31,8 +36,10 @@ def main():
     # -----------------------------
     # 2) Residuals over time
     # -----------------------------
+    view = lttb_frame(df, "forecast_date", ["error"], MAX_PLOT_POINTS)
+
     plt.figure(figsize=(14, 4))
-    plt.plot(df["forecast_date"], df["error"], linewidth=1)
+    plt.plot(view["forecast_date"], view["error"], linewidth=1)
     plt.axhline(0, linewidth=1)
     plt.title("Forecast Residuals Over Time (2025)")
     plt.xlabel("Date")
@@ -45,8 +52,10 @@ def main():
     # -----------------------------
     # 3) Rolling MAE (30-day)
     # -----------------------------
+    view = lttb_frame(df, "forecast_date", ["rolling_mae_30"], MAX_PLOT_POINTS)
+
     plt.figure(figsize=(14, 4))
-    plt.plot(df["forecast_date"], df["rolling_mae_30"], linewidth=1)
+    plt.plot(view["forecast_date"], view["rolling_mae_30"], linewidth=1)
     plt.title("Rolling MAE (30-day) — Naive Walk-Forward (2025)")
     plt.xlabel("Date")
     plt.ylabel("MAE (°C)")
@@ -78,6 +87,16 @@ def main():
     )
     worst.to_csv(FIG_DIR / "worst_10_days_2025.csv", index=False)
 
+    # -----------------------------
+    # 6) Error by regime (if change-point labels are present)
+    # -----------------------------
+    if "regime" in df.columns:
+        spans = df.groupby("regime")["forecast_date"].agg(start="min", end="max")
+        metrics = backtest_by_group(df["actual"], df["forecast"], df["regime"])
+        by_regime = spans.join(metrics.rename_axis("regime"))
+        by_regime.to_csv(FIG_DIR / "error_by_regime_2025.csv")
+        print("Saved regime table:", (FIG_DIR / "error_by_regime_2025.csv").resolve())
+
     print("Saved plots to:", FIG_DIR.resolve())
     print("Saved worst days table:", (FIG_DIR / "worst_10_days_2025.csv").resolve())
 
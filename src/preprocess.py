@@ -1,6 +1,8 @@
 import pandas as pd
 from pathlib import Path
 
+from src.validate import validate_frame
+
 # ----------------------------
 # PATHS
 # ----------------------------
@@ -48,7 +50,7 @@ print(f"Missing days detected: {missing_days}")
 df_full["temp_max"] = df_full["temp_max"].interpolate()
 df_full["temp_min"] = df_full["temp_min"].interpolate()
 df_full["precipitation"] = df_full["precipitation"].fillna(0)
-df_full["wind_speed_max"] = df_full["wind_speed_max"].fillna(method="ffill")
+df_full["wind_speed_max"] = df_full["wind_speed_max"].ffill()
 
 df_full = df_full.reset_index()
 
@@ -59,6 +61,10 @@ assert df_full.isna().sum().sum() == 0, "Missing values remain!"
 
 print("No missing values after preprocessing.")
 
+_, report = validate_frame(df_full)
+print("Rows flagged per quality check:")
+print(report.to_string())
+
 # ----------------------------
 # SAVE
 # ----------------------------
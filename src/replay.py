@@ -0,0 +1,459 @@
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import requests
+
+from src.fetch_daily_archive import (
+    CITIES,
+    DAILY_VARS,
+    fetch_archive_daily,
+)
+from src import fetch_openmeteo
+
+
+# -----------------------------
+# Config
+# -----------------------------
+FIXTURE_DIR = Path("data/fixtures/open_meteo")
+INDEX_FILE = "index.json"
+ARCHIVE_PATH = "/v1/archive"
+
+# Always record from the real API, even if OPEN_METEO_ARCHIVE_URL is
+# exported to point the fetch scripts at a local stub
+LIVE_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+# Clients that send this header get fault decisions keyed on their job id
+# instead of the request params (see ReplayServer)
+JOB_HEADER = "X-Replay-Job"
+
+# Default range when recording live fetch_daily_archive chunks
+RECORD_START = "2021-01-01"
+RECORD_END = "2025-12-31"
+
+
+# -----------------------------
+# Fixtures
+# -----------------------------
+def normalize_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Canonical string form of query params, matching what the server sees
+    (list values such as `daily` are comma-joined).
+    """
+    out = {}
+    for k, v in params.items():
+        if isinstance(v, (list, tuple)):
+            v = ",".join(str(x) for x in v)
+        out[k] = str(v)
+    return out
+
+
+def fixture_key(params: Dict[str, Any]) -> str:
+    """
+    Stable key for a request, independent of param order.
+    """
+    canon = json.dumps(normalize_params(params), sort_keys=True)
+    return hashlib.sha256(canon.encode()).hexdigest()[:20]
+
+
+def archive_params(city_key: str, start_date: str, end_date: str) -> Dict[str, str]:
+    """
+    The exact params fetch_archive_daily sends for one chunk.
+    """
+    city = CITIES[city_key]
+    return normalize_params({
+        "latitude": city.lat,
+        "longitude": city.lon,
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily": ",".join(DAILY_VARS),
+        "timezone": city.timezone,
+    })
+
+
+def yearly_chunks(start: str, end: str) -> List[tuple]:
+    """
+    Same yearly split as fetch_daily_archive.main.
+    """
+    chunks = []
+    for y in range(int(start[:4]), int(end[:4]) + 1):
+        chunks.append((max(start, f"{y}-01-01"), min(end, f"{y}-12-31")))
+    return chunks
+
+
+def _load_index(fixture_dir: Path) -> Dict[str, Dict[str, str]]:
+    path = fixture_dir / INDEX_FILE
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_fixture(fixture_dir: Path, params: Dict[str, Any], body: bytes) -> str:
+    """
+    Store a response body gzip-compressed and register its params.
+    """
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    params = normalize_params(params)
+    key = fixture_key(params)
+
+    (fixture_dir / f"{key}.json.gz").write_bytes(gzip.compress(body, mtime=0))
+
+    index = _load_index(fixture_dir)
+    index[key] = params
+    (fixture_dir / INDEX_FILE).write_text(json.dumps(index, indent=2, sort_keys=True))
+    return key
+
+
+def record(params: Dict[str, Any], fixture_dir: Path = FIXTURE_DIR, url: str = LIVE_ARCHIVE_URL) -> str:
+    """
+    Fetch one live response and save it as a fixture.
+    """
+    r = requests.get(url, params=params, timeout=30)
+    r.raise_for_status()
+    return save_fixture(fixture_dir, params, r.content)
+
+
+def fixture_from_frame(df: pd.DataFrame, params: Dict[str, str]) -> Optional[bytes]:
+    """
+    Build an Open-Meteo-shaped response body from local daily data,
+    for offline fixtures when the live API is unreachable.
+    Returns None when the local data has no rows in the requested range.
+    """
+    mask = (df["date"] >= params["start_date"]) & (df["date"] <= params["end_date"])
+    part = df.loc[mask]
+    if part.empty:
+        return None
+
+    def values(col: str) -> list:
+        return [None if pd.isna(v) else float(v) for v in part[col]]
+
+    body = {
+        "latitude": float(params["latitude"]),
+        "longitude": float(params["longitude"]),
+        "timezone": params["timezone"],
+        "daily_units": {"time": "iso8601"},
+        "daily": {
+            "time": part["date"].dt.strftime("%Y-%m-%d").tolist(),
+            "temperature_2m_max": values("temp_max"),
+            "temperature_2m_min": values("temp_min"),
+            "precipitation_sum": values("precipitation"),
+            "wind_speed_10m_max": values("wind_speed_max"),
+        },
+    }
+    return json.dumps(body).encode()
+
+
+# -----------------------------
+# Stub server
+# -----------------------------
+class ReplayHandler(BaseHTTPRequestHandler):
+    server: "_StubHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        replay: ReplayServer = self.server.replay
+        parts = urlsplit(self.path)
+        if parts.path != ARCHIVE_PATH:
+            replay._count("not_found")
+            self._send(404, b'{"error": true, "reason": "unknown path"}')
+            return
+
+        params = {k: ",".join(v) for k, v in parse_qs(parts.query).items()}
+        key = fixture_key(params)
+        outcome, delay = replay._decide(self.headers.get(JOB_HEADER) or key)
+        time.sleep(delay)
+
+        if outcome == "rate_limited":
+            self._send(429, b'{"error": true, "reason": "Too many requests"}',
+                       {"Retry-After": str(replay.retry_after)})
+            return
+        if outcome == "error":
+            self._send(500, b'{"error": true, "reason": "injected failure"}')
+            return
+
+        blob = replay.fixtures.get(key)
+        if blob is None:
+            replay._count("miss")
+            self._send(404, b'{"error": true, "reason": "no fixture for request"}')
+            return
+
+        replay._count("ok")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            self._send(200, blob, {"Content-Encoding": "gzip"})
+        else:
+            self._send(200, gzip.decompress(blob))
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    replay: "ReplayServer"
+
+
+class ReplayServer:
+    """
+    Local stand-in for the Open-Meteo archive endpoint.
+
+    Serves recorded fixtures with injected latency, 5xx errors and 429s.
+    Each fault decision is derived from (seed, id, n-th request with that
+    id). The id is the client's JOB_HEADER when sent, else the request key.
+    Per-job ids make outcomes reproducible however concurrent fetches
+    interleave, because one job's retries are sequential. Keyed on params
+    alone, this only holds while each distinct request is in flight once.
+
+        with ReplayServer(error_rate=0.1) as server:
+            fetch_archive_daily(..., url=server.url)
+    """
+
+    def __init__(
+        self,
+        fixture_dir: Path = FIXTURE_DIR,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_s: float = 0.0,
+        jitter_s: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+    ):
+        self.fixture_dir = Path(fixture_dir)
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+
+        self.fixtures = {
+            key: (self.fixture_dir / f"{key}.json.gz").read_bytes()
+            for key in _load_index(self.fixture_dir)
+        }
+        self.stats: Counter = Counter()
+        self._seen: Counter = Counter()
+        self._lock = threading.Lock()
+
+        self._httpd = _StubHTTPServer((host, port), ReplayHandler)
+        self._httpd.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{ARCHIVE_PATH}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _decide(self, ident: str) -> tuple:
+        """
+        Pick (outcome, delay) for the n-th request seen for `ident`.
+        Injected faults are counted here; "ok" is only counted once the
+        handler has actually found a fixture to serve.
+        """
+        with self._lock:
+            n = self._seen[ident]
+            self._seen[ident] += 1
+            self.stats["requests"] += 1
+
+        rng = random.Random(f"{self.seed}:{ident}:{n}")
+        delay = max(0.0, self.latency_s + rng.uniform(-self.jitter_s, self.jitter_s))
+        u = rng.random()
+        if u < self.rate_limit_rate:
+            outcome = "rate_limited"
+        elif u < self.rate_limit_rate + self.error_rate:
+            outcome = "error"
+        else:
+            return "ok", delay
+
+        self._count(outcome)
+        return outcome, delay
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(
+    server: ReplayServer,
+    workers: int = 8,
+    repeat: int = 1,
+    retries: int = 3,
+    sleep_s: float = 0.1,
+) -> Dict[str, Any]:
+    """
+    Replay every fixture through fetch_archive_daily concurrently and
+    report throughput plus how many calls survived injected faults.
+    Each call sends its job number in JOB_HEADER, so fault outcomes are
+    the same on every run regardless of thread scheduling.
+    """
+    jobs = list(enumerate(list(_load_index(server.fixture_dir).values()) * repeat))
+
+    def run(job) -> bool:
+        job_id, p = job
+        try:
+            fetch_archive_daily(
+                lat=float(p["latitude"]),
+                lon=float(p["longitude"]),
+                start_date=p["start_date"],
+                end_date=p["end_date"],
+                timezone=p["timezone"],
+                retries=retries,
+                sleep_s=sleep_s,
+                url=server.url,
+                headers={JOB_HEADER: str(job_id)},
+            )
+            return True
+        except Exception:
+            return False
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, jobs))
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "calls": len(jobs),
+        "succeeded": sum(results),
+        "failed": len(results) - sum(results),
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(len(jobs) / elapsed, 2) if elapsed > 0 else float("inf"),
+        **dict(server.stats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record / replay Open-Meteo archive responses.")
+    parser.add_argument("--fixtures", type=str, default=str(FIXTURE_DIR))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    for name, help_text in [
+        ("record", "Fetch live responses and save them as fixtures"),
+        ("seed", "Build fixtures offline from a local daily CSV/parquet"),
+    ]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--target", type=str, default="archive", choices=["archive", "openmeteo"],
+                       help="archive: fetch_daily_archive yearly chunks; openmeteo: the fetch_openmeteo.py request")
+        p.add_argument("--city", type=str, default="hargeisa", choices=sorted(CITIES.keys()))
+        default_range = f"{RECORD_START} → {RECORD_END}" if name == "record" else "the data's date range"
+        p.add_argument("--start", type=str, default=None, help=f"YYYY-MM-DD (default: {default_range})")
+        p.add_argument("--end", type=str, default=None, help=f"YYYY-MM-DD (default: {default_range})")
+        if name == "seed":
+            p.add_argument("--data", type=str, default="data/raw/hargeisa_daily_weather.csv")
+
+    for name in ["serve", "bench"]:
+        p = sub.add_parser(name, help="Run the stub server" if name == "serve" else "Benchmark concurrent fetches")
+        p.add_argument("--port", type=int, default=8765 if name == "serve" else 0)
+        p.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+        p.add_argument("--jitter", type=float, default=0.0, help="± seconds of random latency")
+        p.add_argument("--error_rate", type=float, default=0.0, help="Share of requests answered with 500")
+        p.add_argument("--rate_limit_rate", type=float, default=0.0, help="Share of requests answered with 429")
+        p.add_argument("--retry_after", type=int, default=1)
+        p.add_argument("--seed", type=int, default=0)
+        if name == "bench":
+            p.add_argument("--workers", type=int, default=8)
+            p.add_argument("--repeat", type=int, default=1)
+            p.add_argument("--retries", type=int, default=3)
+            p.add_argument("--sleep_s", type=float, default=0.1)
+
+    args = parser.parse_args()
+    fixture_dir = Path(args.fixtures)
+
+    if args.cmd in ("record", "seed"):
+        df = None
+        start, end = args.start or RECORD_START, args.end or RECORD_END
+        if args.cmd == "seed":
+            path = Path(args.data)
+            df = pd.read_csv(path, parse_dates=["date"]) if path.suffix == ".csv" else pd.read_parquet(path)
+            start = args.start or df["date"].min().strftime("%Y-%m-%d")
+            end = args.end or df["date"].max().strftime("%Y-%m-%d")
+
+        if args.target == "openmeteo":
+            jobs = [("fetch_openmeteo", normalize_params(fetch_openmeteo.request_params()))]
+        else:
+            jobs = [(args.city, archive_params(args.city, s, e)) for s, e in yearly_chunks(start, end)]
+
+        for label, params in jobs:
+            span = f"{params['start_date']} → {params['end_date']}"
+            if df is None:
+                key = record(params, fixture_dir)
+            else:
+                body = fixture_from_frame(df, params)
+                if body is None:
+                    print(f"[seed] WARNING: no local rows for {span}, skipped")
+                    continue
+                key = save_fixture(fixture_dir, params, body)
+            print(f"[{args.cmd}] {label} {span}  ({key})")
+        return
+
+    server = ReplayServer(
+        fixture_dir,
+        port=args.port,
+        latency_s=args.latency,
+        jitter_s=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"[replay] {len(server.fixtures)} fixtures from {fixture_dir}")
+
+    if args.cmd == "serve":
+        print(f"[replay] serving on {server.url}")
+        print(f"[replay] export OPEN_METEO_ARCHIVE_URL={server.url}")
+        with server:
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+        return
+
+    with server:
+        result = benchmark(server, args.workers, args.repeat, args.retries, args.sleep_s)
+    print("[bench]")
+    for k, v in result.items():
+        print(f"  {k:<14}: {v}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
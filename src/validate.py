@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import argparse
+from enum import IntFlag
+from pathlib import Path
+import sys
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import pandas as pd
+
+
+# -----------------------------
+# Config
+# -----------------------------
+DATA_PATH = Path("data/processed/hargeisa_daily_weather.parquet")
+REPORT_PATH = Path("reports/data_quality_report.csv")
+
+
+class QCFlag(IntFlag):
+    """
+    Per-value quality flags. A column's mask is the OR of every check it failed.
+    """
+    MISSING = 1
+    OUT_OF_RANGE = 2
+    MIN_GT_MAX = 4
+    NEGATIVE_PRECIP = 8
+    STUCK = 16
+    SPIKE = 32
+
+
+# Plausible physical limits (Open-Meteo units: °C, mm, km/h).
+# Negative precipitation is reported as NEGATIVE_PRECIP only, so its
+# range has no lower bound.
+PHYSICAL_RANGES: Dict[str, Tuple[float, float]] = {
+    "temp_max": (-40.0, 60.0),
+    "temp_min": (-40.0, 60.0),
+    "precipitation": (-np.inf, 500.0),
+    "wind_speed_max": (0.0, 250.0),
+}
+
+# Shortest run of identical values treated as a stuck sensor
+STUCK_MIN_RUN = 5
+
+# Rolling robust z-score settings. Precipitation is spiky by nature,
+# so the spike check only runs on continuous variables.
+SPIKE_COLUMNS = ["temp_max", "temp_min", "wind_speed_max"]
+SPIKE_WINDOW = 15
+SPIKE_Z = 6.0
+
+# Rows per block for the rolling median (bounds the (rows, window) copy)
+_CHUNK_ROWS = 1 << 20
+
+
+def run_lengths(values: np.ndarray) -> np.ndarray:
+    """
+    Run-length encode `values` and return, for each element, the length
+    of the run of identical values it belongs to. NaNs never form runs.
+    """
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    same = values[1:] == values[:-1]
+    starts = np.flatnonzero(np.concatenate([[True], ~same]))
+    lengths = np.diff(np.append(starts, n))
+    return np.repeat(lengths, lengths)
+
+
+def rolling_median(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Centered rolling median over an odd `window`, edges reflected.
+    Works on fixed-size blocks of sliding-window views so memory stays
+    bounded regardless of series length. `x` must not contain NaNs.
+    """
+    half = window // 2
+    padded = np.pad(x, half, mode="reflect") if len(x) > half else np.pad(x, half, mode="edge")
+    out = np.empty(len(x))
+    for lo in range(0, len(x), _CHUNK_ROWS):
+        hi = min(lo + _CHUNK_ROWS, len(x))
+        view = sliding_window_view(padded[lo:hi + 2 * half], window)
+        out[lo:hi] = np.partition(view, half, axis=1)[:, half]
+    return out
+
+
+def robust_zscore(x: np.ndarray, window: int = SPIKE_WINDOW) -> np.ndarray:
+    """
+    Centered rolling robust z-score: (x - median) / (1.4826 * MAD).
+    Missing values get NaN, as do zero-MAD windows (flat stretches).
+    """
+    window = window | 1
+    missing = np.isnan(x)
+    filled = pd.Series(x).ffill().bfill().to_numpy() if missing.any() else x
+    if np.isnan(filled).all():
+        return np.full(len(x), np.nan)
+
+    med = rolling_median(filled, window)
+    mad = rolling_median(np.abs(filled - med), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (filled - med) / (1.4826 * mad)
+    z[(mad == 0) | missing] = np.nan
+    return z
+
+
+def validate_frame(
+    df: pd.DataFrame,
+    ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+    stuck_min_run: int = STUCK_MIN_RUN,
+    spike_window: int = SPIKE_WINDOW,
+    spike_z: float = SPIKE_Z,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run all quality checks in one vectorized pass.
+
+    Returns (flags, report):
+    - flags: one uint8 `qc_<column>` bitmask per checked column (see QCFlag)
+    - report: rows flagged per column and check
+    Rows must already be in time order.
+    """
+    ranges = PHYSICAL_RANGES if ranges is None else ranges
+    cols = [c for c in ranges if c in df.columns]
+
+    flags = pd.DataFrame(index=df.index)
+    for col in cols:
+        x = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        lo, hi = ranges[col]
+        mask = np.zeros(len(x), dtype=np.uint8)
+
+        missing = np.isnan(x)
+        mask[missing] |= np.uint8(QCFlag.MISSING)
+        mask[(x < lo) | (x > hi)] |= np.uint8(QCFlag.OUT_OF_RANGE)
+
+        # Dry spells are legitimately constant, so only non-zero
+        # precipitation runs count as stuck.
+        stuck = (run_lengths(x) >= stuck_min_run) & ~missing
+        if col == "precipitation":
+            stuck &= x != 0
+        mask[stuck] |= np.uint8(QCFlag.STUCK)
+
+        if col in SPIKE_COLUMNS and len(x):
+            z = robust_zscore(x, spike_window)
+            mask[np.abs(z) > spike_z] |= np.uint8(QCFlag.SPIKE)
+
+        if col == "precipitation":
+            mask[x < 0] |= np.uint8(QCFlag.NEGATIVE_PRECIP)
+
+        flags[f"qc_{col}"] = mask
+
+    if "temp_min" in cols and "temp_max" in cols:
+        inverted = (df["temp_min"] > df["temp_max"]).to_numpy()
+        flags.loc[inverted, ["qc_temp_min", "qc_temp_max"]] |= np.uint8(QCFlag.MIN_GT_MAX)
+
+    report = quality_report(flags)
+    return flags, report
+
+
+def quality_report(flags: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count flagged rows per column and check from the bitmask columns.
+    """
+    counts = {
+        flag.name: [int(np.count_nonzero(flags[c].to_numpy() & int(flag))) for c in flags.columns]
+        for flag in QCFlag
+    }
+    report = pd.DataFrame(counts, index=[c[len("qc_"):] for c in flags.columns])
+    report.index.name = "column"
+    report["any"] = (flags.to_numpy() != 0).sum(axis=0)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate weather data and store per-row QC flags.")
+    parser.add_argument("--data", type=str, default=str(DATA_PATH))
+    parser.add_argument("--report", type=str, default=str(REPORT_PATH))
+    parser.add_argument("--stuck_min_run", type=int, default=STUCK_MIN_RUN)
+    parser.add_argument("--spike_window", type=int, default=SPIKE_WINDOW)
+    parser.add_argument("--spike_z", type=float, default=SPIKE_Z)
+    args = parser.parse_args()
+
+    path = Path(args.data)
+    if path.suffix == ".csv":
+        df = pd.read_csv(path, parse_dates=["date"])
+    else:
+        df = pd.read_parquet(path)
+    df = df.sort_values("date").reset_index(drop=True)
+
+    flags, report = validate_frame(
+        df,
+        stuck_min_run=args.stuck_min_run,
+        spike_window=args.spike_window,
+        spike_z=args.spike_z,
+    )
+
+    print("[quality report] rows flagged per check")
+    print(report.to_string())
+
+    report_path = Path(args.report)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(report_path)
+    print(f"\n[saved] report → {report_path}")
+
+    if path.suffix != ".csv":
+        df = df.drop(columns=[c for c in flags.columns if c in df.columns]).join(flags)
+        df.to_parquet(path, index=False)
+        print(f"[saved] qc_* columns → {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
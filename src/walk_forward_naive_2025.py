@@ -3,6 +3,8 @@ import numpy as np
 from pathlib import Path
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
+from src.backtest import backtest_by_group, bootstrap_metrics
+
 DATA_PATH = Path("data/processed/hargeisa_daily_weather.parquet")
 OUT_PATH = Path("reports/naive_walk_forward_2025.csv")
 
@@ -34,20 +36,28 @@ def main():
             "error": actual - forecast,
             "abs_error": abs(actual - forecast),
         })
+        if "regime" in df_2025.columns:
+            forecasts[-1]["regime"] = tomorrow["regime"]
 
     result = pd.DataFrame(forecasts)
 
     mae = mean_absolute_error(result["actual"], result["forecast"])
     r = rmse(result["actual"], result["forecast"])
+    ci = bootstrap_metrics(result["actual"], result["forecast"])
 
     OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     result.to_csv(OUT_PATH, index=False)
 
     print("Naive Walk-Forward Forecasting (2025)")
     print(f"Days evaluated : {len(result)}")
-    print(f"MAE           : {mae:.3f} °C")
-    print(f"RMSE          : {r:.3f} °C")
+    print(f"MAE           : {mae:.3f} °C  (95% CI {ci['MAE_low']:.3f} – {ci['MAE_high']:.3f})")
+    print(f"RMSE          : {r:.3f} °C  (95% CI {ci['RMSE_low']:.3f} – {ci['RMSE_high']:.3f})")
     print(f"Saved results : {OUT_PATH}")
 
+    if "regime" in result.columns:
+        by_regime = backtest_by_group(result["actual"], result["forecast"], result["regime"]).rename_axis("regime")
+        print("\nError by regime:")
+        print(by_regime.round(3).to_string())
+
 if __name__ == "__main__":
     main()